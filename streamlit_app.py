@@ -10,7 +10,7 @@ import plotly.express as px
 APP_NAME = "Astra Defect Tracker"
 st.set_page_config(page_title=APP_NAME, page_icon="🛡️", layout="wide")
 
-st.markdown("""
+APP_CSS = """
 <style>
 .stApp { background-color: #f0f2f6; }
 .metric-card {
@@ -41,7 +41,9 @@ div[data-testid="stButton"] > button {
     font-weight: 600 !important;
 }
 </style>
-""", unsafe_allow_html=True)
+"""
+# must be re-emitted on every rerun, otherwise Streamlit drops the styles from the page
+st.markdown(APP_CSS, unsafe_allow_html=True)
 
 # ==========================================
 # 2. CONSTANTS
@@ -57,11 +59,42 @@ DISPLAY_COLS = [
     "id", "defect_title", "module", "category", "environment", "priority",
     "reported_by", "reporter_email", "assigned_to", "status"
 ]
-REQUIRED_COLS = set(DISPLAY_COLS + ["description", "comments"])
+# long text fields, fetched per record only when its editor opens
+DETAIL_COLS = ["description", "comments"]
+# Insights analysis dimensions -> labels
+DIM_OPTIONS = {"module": "Module", "priority": "Priority", "status": "Status", "category": "Category", "environment": "Env"}
+# low-cardinality columns stored as pandas category (int codes, not per-row str objects).
+# Derived from DIM_OPTIONS: the Insights filter reads .cat.categories of every dimension.
+CATEGORICAL_COLS = [*DIM_OPTIONS, "assigned_to"]
 
 # ==========================================
 # 3. DB
 # ==========================================
+# all defects SQL in one place; callers only bind parameters
+# Explicit column list (no SELECT *): if the table ever lacks one of DISPLAY_COLS the whole
+# load fails into load_data()'s "Could not load data" warning instead of back-filling blanks.
+SELECT_DEFECTS_SQL = text(f"SELECT {', '.join(DISPLAY_COLS)} FROM public.defects ORDER BY id DESC")
+SELECT_DEFECT_DETAIL_SQL = text(f"SELECT {', '.join(DETAIL_COLS)} FROM public.defects WHERE id=:id")
+
+INSERT_DEFECT_SQL = text("""
+    INSERT INTO public.defects
+    (defect_title, module, priority, category, environment,
+     reported_by, reporter_email, description, status, assigned_to)
+    VALUES (:t, :m, :p, :c, :env, :rn, :re, :d, 'New', 'Unassigned')
+""")
+
+UPDATE_DEFECT_SQL = text("""
+    UPDATE public.defects SET
+        defect_title=:t,
+        status=:s,
+        priority=:p,
+        assigned_to=:a,
+        description=:d,
+        comments=:c,
+        updated_at=NOW()
+    WHERE id=:id
+""")
+
 @st.cache_resource
 def get_engine():
     db_url = st.secrets.get("SUPABASE_DATABASE_URL") if hasattr(st, "secrets") else None
@@ -80,25 +113,45 @@ def load_data():
     """
     try:
         with get_engine().connect() as conn:
-            df = pd.read_sql(text("SELECT * FROM public.defects ORDER BY id DESC"), conn)
+            # Arrow-backed columns: text lands in contiguous buffers instead of per-cell str objects
+            df = pd.read_sql(SELECT_DEFECTS_SQL, conn, dtype_backend="pyarrow")
 
         if df.empty:
             return df
 
-        for c in REQUIRED_COLS:
-            if c not in df.columns:
-                df[c] = ""
-            df[c] = df[c].fillna("")
+        # normalise all text columns in one frame-level pass
+        text_cols = [c for c in DISPLAY_COLS if c != "id"]
+        df[text_cols] = df[text_cols].astype("string[pyarrow]").fillna("")
 
-        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64").astype(str)
+        df["id"] = pd.to_numeric(df["id"], errors="coerce").astype("Int64").astype("string[pyarrow]")
 
-        cols = [c for c in DISPLAY_COLS if c in df.columns]
-        df["__search"] = df[cols].astype(str).agg(" | ".join, axis=1).str.lower()
+        df["__search"] = df["id"].str.cat([df[c] for c in text_cols], sep=" | ").str.lower()
 
-        return df
+        for c in CATEGORICAL_COLS:
+            df[c] = df[c].astype("category")
+
+        # index by id so the editor can look a record up directly instead of masking the frame
+        return df.set_index("id", drop=False).rename_axis(None)
     except Exception as e:
         st.warning(f"Could not load data from DB: {e}")
-        return pd.DataFrame(columns=list(REQUIRED_COLS))
+        return pd.DataFrame(columns=DISPLAY_COLS)
+
+@st.cache_data(ttl=60)
+def load_defect_detail(rec_id: str) -> dict:
+    """
+    Fetches description/comments for ONE defect, so the list query stays light.
+    """
+    with get_engine().connect() as conn:
+        row = conn.execute(SELECT_DEFECT_DETAIL_SQL, {"id": int(float(rec_id))}).mappings().first()
+    return {c: "" if row is None or row[c] is None else str(row[c]) for c in DETAIL_COLS}
+
+def insert_defect(payload: dict):
+    with get_engine().begin() as conn:
+        conn.execute(INSERT_DEFECT_SQL, payload)
+
+def update_defect(payload: dict):
+    with get_engine().begin() as conn:
+        conn.execute(UPDATE_DEFECT_SQL, payload)
 
 def fast_search(df: pd.DataFrame, q: str) -> pd.DataFrame:
     q = (q or "").strip().lower()
@@ -199,14 +252,8 @@ def create_defect_dialog():
                 st.error("Validation Error: Please provide valid Summary, Name, and Email.")
                 return
 
-            with get_engine().begin() as conn:
-                conn.execute(text("""
-                    INSERT INTO public.defects
-                    (defect_title, module, priority, category, environment,
-                     reported_by, reporter_email, description, status, assigned_to)
-                    VALUES (:t, :m, :p, :c, :env, :rn, :re, :d, 'New', 'Unassigned')
-                """), {"t": t, "m": mod_in, "p": pri_in, "c": cat_in, "env": env_in,
-                       "rn": n, "re": e, "d": desc_in})
+            insert_defect({"t": t, "m": mod_in, "p": pri_in, "c": cat_in, "env": env_in,
+                           "rn": n, "re": e, "d": desc_in})
 
             st.cache_data.clear()
             st.rerun()
@@ -239,25 +286,23 @@ def edit_defect_dialog(record: dict):
             st.rerun()
 
         if save_clicked:
+            old_values = (str(record.get("defect_title", "")), old_status, old_priority, old_agent,
+                          str(record.get("description", "")), str(record.get("comments", "")))
+            new_values = (new_title, new_status, new_pri, new_assign, new_desc, new_comm)
             try:
                 rec_id_str = str(record.get("id", "")).strip()
                 rec_id_int = int(float(rec_id_str))  # handles "12" or "12.0"
-                with get_engine().begin() as conn:
-                    conn.execute(text("""
-                        UPDATE public.defects SET
-                            defect_title=:t,
-                            status=:s,
-                            priority=:p,
-                            assigned_to=:a,
-                            description=:d,
-                            comments=:c,
-                            updated_at=NOW()
-                        WHERE id=:id
-                    """), {"t": new_title, "s": new_status, "p": new_pri, "a": new_assign,
-                           "d": new_desc, "c": new_comm, "id": rec_id_int})
-
-                st.toast(f"✅ Record {rec_id_str} Updated!", icon="🛡️")
-                st.cache_data.clear()
+
+                # ✅ Only hit the DB (and drop the cache) when something was actually edited
+                if new_values != old_values:
+                    update_defect({"t": new_title, "s": new_status, "p": new_pri, "a": new_assign,
+                                   "d": new_desc, "c": new_comm, "id": rec_id_int})
+
+                    st.toast(f"✅ Record {rec_id_str} Updated!", icon="🛡️")
+                    st.cache_data.clear()
+                else:
+                    st.toast(f"ℹ️ No changes to Record {rec_id_str}", icon="🛡️")
+
                 st.session_state.editing_id = None
                 st.session_state.last_selected_id = None
                 st.session_state.table_key_version += 1  # reset selection after save
@@ -273,10 +318,15 @@ df = load_data()
 st.title(f"🛡️ {APP_NAME}")
 
 if not df.empty:
+    # one pass over status for all KPI cards (no per-card boolean mask + frame copy)
+    status_counts = df["status"].value_counts()
+    resolved_total = int(status_counts.get("Resolved", 0) + status_counts.get("Closed", 0))
+    active_total = len(df) - resolved_total
+
     k1, k2, k3 = st.columns(3)
     k1.markdown(f'<div class="metric-card global-bucket"><h3>Global Items</h3><h1>{len(df)}</h1></div>', unsafe_allow_html=True)
-    k2.markdown(f'<div class="metric-card open-bucket"><h3>Active</h3><h1>{len(df[~df["status"].isin(["Resolved", "Closed"])])}</h1></div>', unsafe_allow_html=True)
-    k3.markdown(f'<div class="metric-card resolved-bucket"><h3>Resolved Total</h3><h1>{len(df[df["status"].isin(["Resolved", "Closed"])])}</h1></div>', unsafe_allow_html=True)
+    k2.markdown(f'<div class="metric-card open-bucket"><h3>Active</h3><h1>{active_total}</h1></div>', unsafe_allow_html=True)
+    k3.markdown(f'<div class="metric-card resolved-bucket"><h3>Resolved Total</h3><h1>{resolved_total}</h1></div>', unsafe_allow_html=True)
 else:
     st.info("Database is empty. Add a new defect to begin.")
 
@@ -337,9 +387,16 @@ with tab_tracker:
 
     # ✅ Open modal after the selection rerun (reliable)
     if st.session_state.editing_id and not df.empty:
-        rec = df[df["id"] == st.session_state.editing_id]
-        if not rec.empty:
-            edit_defect_dialog(rec.iloc[0].to_dict())
+        if st.session_state.editing_id in df.index:
+            try:
+                detail = load_defect_detail(st.session_state.editing_id)
+            except Exception as e:
+                st.warning(f"Could not load record details: {e}")
+                st.session_state.editing_id = None
+                st.session_state.last_selected_id = None
+                st.session_state.table_key_version += 1  # drop selection so the row can be re-clicked
+            else:
+                edit_defect_dialog({**df.loc[st.session_state.editing_id].to_dict(), **detail})
         else:
             st.session_state.editing_id = None
 
@@ -347,27 +404,30 @@ with tab_insights:
     st.header("📊 Performance Insights")
     if not df.empty:
         c1, c2, c3 = st.columns(3)
-        dim_options = {"module": "Module", "priority": "Priority", "status": "Status", "category": "Category", "environment": "Env"}
-        primary_dim = c1.selectbox("1. Analysis Dimension", options=list(dim_options.keys()), format_func=lambda x: dim_options[x])
-        unique_vals = sorted(df[primary_dim].dropna().unique().tolist())
-        selected_val = c2.selectbox(f"2. Filter Specific {dim_options[primary_dim]}", options=["All Data"] + unique_vals)
-        pivot_dim = c3.selectbox("3. Pivot/Compare By", options=[opt for opt in dim_options.keys() if opt != primary_dim], format_func=lambda x: dim_options[x])
+        primary_dim = c1.selectbox("1. Analysis Dimension", options=list(DIM_OPTIONS.keys()), format_func=lambda x: DIM_OPTIONS[x])
+        # categories already hold the distinct values, so no O(N) unique() scan per rerun
+        unique_vals = sorted(df[primary_dim].cat.categories.tolist())
+        selected_val = c2.selectbox(f"2. Filter Specific {DIM_OPTIONS[primary_dim]}", options=["All Data"] + unique_vals)
+        pivot_dim = c3.selectbox("3. Pivot/Compare By", options=[opt for opt in DIM_OPTIONS.keys() if opt != primary_dim], format_func=lambda x: DIM_OPTIONS[x])
 
         chart_df = df if selected_val == "All Data" else df[df[primary_dim] == selected_val]
         st.divider()
 
+        # aggregate once; bar and pie share the same small counts frame
+        pivot_counts = chart_df.groupby(pivot_dim, observed=True).size().reset_index(name="Count")
+
         g1, g2 = st.columns(2)
-        fig_bar = px.bar(chart_df.groupby(pivot_dim).size().reset_index(name="Count"),
+        fig_bar = px.bar(pivot_counts,
                          x=pivot_dim, y="Count", color=pivot_dim,
-                         title=f"Volume by {dim_options[pivot_dim]}")
+                         title=f"Volume by {DIM_OPTIONS[pivot_dim]}")
         g1.plotly_chart(fig_bar, use_container_width=True)
 
-        fig_pie = px.pie(chart_df, names=pivot_dim, hole=0.5,
-                         title=f"% Distribution of {dim_options[pivot_dim]}")
+        fig_pie = px.pie(pivot_counts, names=pivot_dim, values="Count", hole=0.5,
+                         title=f"% Distribution of {DIM_OPTIONS[pivot_dim]}")
         g2.plotly_chart(fig_pie, use_container_width=True)
 
         st.subheader("👤 Agent Workload by Status")
-        agent_status_df = df.groupby(["assigned_to", "status"]).size().reset_index(name="Items")
+        agent_status_df = df.groupby(["assigned_to", "status"], observed=True).size().reset_index(name="Items")
         fig_agent = px.bar(
             agent_status_df,
             x="Items",